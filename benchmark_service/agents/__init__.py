@@ -2,20 +2,39 @@
 Agents Package
 """
 
+import functools
+import types
+
 from .base import AgentInterface
 from .openai_adapter import OpenAIAgentAdapter, OpenAIConfig
 from .anthropic_adapter import AnthropicAgentAdapter, AnthropicConfig
 from .local_adapter import LocalAgentAdapter, LocalAgentConfig
 
-# Registro de adapters disponíveis
-AGENT_ADAPTERS = {
-    "openai": OpenAIAgentAdapter,
-    "anthropic": AnthropicAgentAdapter,
-    "local": LocalAgentAdapter,
-}
+# Registro de adapters disponíveis (imutável)
+AGENT_ADAPTERS = types.MappingProxyType(
+    {
+        "openai": OpenAIAgentAdapter,
+        "anthropic": AnthropicAgentAdapter,
+        "local": LocalAgentAdapter,
+    }
+)
+
+AGENT_CONFIGS = types.MappingProxyType(
+    {
+        "openai": OpenAIConfig,
+        "anthropic": AnthropicConfig,
+        "local": LocalAgentConfig,
+    }
+)
+
+
+@functools.lru_cache(maxsize=64)
+def get_adapter(kind: str, config_json: str) -> AgentInterface:
+    """Retorna um adapter pré-configurado, reutilizado entre chamadas.
 
-AGENT_CONFIGS = {
-    "openai": OpenAIConfig,
-    "anthropic": AnthropicConfig,
-    "local": LocalAgentConfig,
-}
+    A chave do cache é (kind, JSON canônico da config), então repetir o
+    mesmo agent em várias etapas do benchmark reaproveita a instância e
+    seu pool de conexões em vez de revalidar a config a cada chamada.
+    """
+    config = AGENT_CONFIGS[kind].model_validate_json(config_json)
+    return AGENT_ADAPTERS[kind](config)
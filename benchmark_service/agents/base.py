@@ -2,8 +2,9 @@
 Interface base para todos os agents
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, AsyncIterator
 
 
 class AgentInterface(ABC):
@@ -16,6 +17,32 @@ class AgentInterface(ABC):
         """Envia uma consulta ao agent"""
         pass
 
+    async def query_batch(
+        self, prompts: List[str], context: Dict[str, Any] = None
+    ) -> List[Dict[str, Any]]:
+        """Envia várias consultas ao agent.
+
+        Adapters cujo backend aceita lotes nativos devem sobrescrever este
+        método com uma única chamada HTTP; o default dispara as consultas
+        concorrentemente sobre a sessão compartilhada.
+        """
+        return list(
+            await asyncio.gather(*(self.query(prompt, context) for prompt in prompts))
+        )
+
+    async def query_stream(
+        self, prompt: str, context: Dict[str, Any] = None
+    ) -> AsyncIterator[str]:
+        """Gera a resposta em tokens incrementais.
+
+        Permite medir TTFT (tempo até o primeiro token) cronometrando o
+        primeiro item emitido e cancelar cedo sem baixar o corpo inteiro.
+        O default emite a resposta completa de query() em um único item.
+        """
+        result = await self.query(prompt, context)
+        if "response" in result:
+            yield result["response"]
+
     @abstractmethod
     def get_info(self) -> Dict[str, Any]:
         """Retorna informações sobre o agent"""
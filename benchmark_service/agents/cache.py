@@ -0,0 +1,67 @@
+"""
+Cache de respostas para os adapters de agents
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+class LLMCache:
+    """Cache LRU em memória para respostas de agents.
+
+    Benchmarks repetem os mesmos prompts entre execuções e repetições;
+    um hit no cache elimina o round-trip HTTP e o custo de tokens.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+
+    @staticmethod
+    def make_key(
+        model: str, prompt: str, temperature: float, max_tokens: int
+    ) -> str:
+        """Gera chave determinística para uma consulta"""
+        raw = json.dumps(
+            {
+                "model": model,
+                "prompt": prompt,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retorna a resposta cacheada ou None se ausente/expirada"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if time.monotonic() > expires_at:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Armazena uma resposta, descartando a entrada mais antiga se cheio"""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Limpa todas as entradas do cache"""
+        self._entries.clear()
+
+
+# Instância global compartilhada pelos adapters
+llm_cache = LLMCache()
@@ -3,16 +3,59 @@ Servidor de exemplo para agent local
 """
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Dict, Any, List
+import asyncio
+import concurrent.futures
+import os
+import re
 import uvicorn
-import time
 import random
 
 app = FastAPI(
-    title="Local Agent Server", description="Servidor de exemplo para agent local"
+    title="Local Agent Server",
+    description="Servidor de exemplo para agent local",
+    default_response_class=ORJSONResponse,
 )
 
+# Simulação de latência pode ser desligada em modo benchmark
+SIMULATE_LATENCY = os.getenv("LOCAL_AGENT_SIMULATE_LATENCY", "1") != "0"
+
+# Respostas pré-computadas com contagem de tokens memoizada:
+# índices 0-2 casam com palavras-chave, índice 3 é o default
+_RESPONSES = [
+    "I've analyzed the mathematical problem. The solution involves applying the quadratic formula, which gives us the result of 42 as the primary solution.",
+    "Through careful logical analysis, I can conclude that the premises lead to the inevitable conclusion that all logical paths converge at this point.",
+    "This is a thoughtful response to your query. After considering multiple perspectives and relevant information, I can provide this comprehensive answer.",
+    "As a locally hosted AI assistant, I specialize in providing detailed and accurate responses to a wide variety of questions and tasks. How can I assist you further?",
+]
+_RESPONSES = [(text, len(text.split())) for text in _RESPONSES]
+
+# Uma única varredura linear do prompt em vez de múltiplos `in`
+_PATTERN = re.compile(r"(math|calculate|reasoning|logic|question)", re.IGNORECASE)
+_BUCKET = {"math": 0, "calculate": 0, "reasoning": 1, "logic": 1, "question": 2}
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Cria o pool de threads reutilizável para trabalho bloqueante"""
+    app.state.executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(32, (os.cpu_count() or 1) * 4)
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Encerra o pool de threads"""
+    app.state.executor.shutdown(wait=False)
+
+
+async def run_blocking(fn, *args):
+    """Executa uma chamada bloqueante no pool sem travar o event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(app.state.executor, fn, *args)
+
 
 class ChatRequest(BaseModel):
     messages: List[Dict[str, str]]
@@ -27,21 +70,34 @@ class ChatResponse(BaseModel):
     model: str
 
 
+class BatchChatRequest(BaseModel):
+    prompts: List[str]
+    model: str = "local-model"
+    temperature: float = 0.7
+    max_tokens: int = 1024
+
+
+class BatchChatResponse(BaseModel):
+    choices: List[Dict[str, Any]]
+    usages: List[Dict[str, int]]
+    model: str
+
+
 @app.post("/chat")
 async def chat(request: ChatRequest):
     """Endpoint para chat com o agent local"""
     # Simular processamento
     prompt = request.messages[-1]["content"] if request.messages else ""
 
-    # Simular tempo de processamento
-    time.sleep(0.1 + random.uniform(0.05, 0.2))
+    # Simular tempo de processamento sem bloquear o event loop
+    if SIMULATE_LATENCY:
+        await asyncio.sleep(0.1 + random.uniform(0.05, 0.2))
 
     # Gerar resposta baseada no prompt
-    response_text = generate_local_response(prompt)
+    response_text, output_tokens = _lookup_response(prompt)
 
     # Calcular tokens
     input_tokens = len(prompt.split())
-    output_tokens = len(response_text.split())
 
     return ChatResponse(
         choices=[{"message": {"role": "assistant", "content": response_text}}],
@@ -54,16 +110,42 @@ async def chat(request: ChatRequest):
     )
 
 
+@app.post("/batch_chat")
+async def batch_chat(request: BatchChatRequest):
+    """Endpoint para processar vários prompts em uma única chamada"""
+    choices = []
+    usages = []
+
+    for prompt in request.prompts:
+        response_text, output_tokens = _lookup_response(prompt)
+        input_tokens = len(prompt.split())
+
+        choices.append({"message": {"role": "assistant", "content": response_text}})
+        usages.append(
+            {
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            }
+        )
+
+    return BatchChatResponse(choices=choices, usages=usages, model=request.model)
+
+
+def _lookup_response(prompt: str) -> tuple:
+    """Retorna (texto, tokens de saída) pré-computados para o prompt"""
+    # min sobre os buckets preserva a prioridade original
+    # (math/calculate > reasoning/logic > question), não a ordem em
+    # que as palavras aparecem no prompt
+    matches = _PATTERN.findall(prompt)
+    if matches:
+        return _RESPONSES[min(_BUCKET[m.lower()] for m in matches)]
+    return _RESPONSES[3]
+
+
 def generate_local_response(prompt: str) -> str:
     """Gera uma resposta simulada para o prompt"""
-    if "math" in prompt.lower() or "calculate" in prompt.lower():
-        return "I've analyzed the mathematical problem. The solution involves applying the quadratic formula, which gives us the result of 42 as the primary solution."
-    elif "reasoning" in prompt.lower() or "logic" in prompt.lower():
-        return "Through careful logical analysis, I can conclude that the premises lead to the inevitable conclusion that all logical paths converge at this point."
-    elif "question" in prompt.lower():
-        return "This is a thoughtful response to your query. After considering multiple perspectives and relevant information, I can provide this comprehensive answer."
-    else:
-        return "As a locally hosted AI assistant, I specialize in providing detailed and accurate responses to a wide variety of questions and tasks. How can I assist you further?"
+    return _lookup_response(prompt)[0]
 
 
 @app.get("/health")
@@ -84,4 +166,15 @@ async def get_info():
 
 
 if __name__ == "__main__":
-    uvicorn.run("local_agent_server:app", host="0.0.0.0", port=8001, reload=True)
+    # reload deve ficar ligado apenas em desenvolvimento; em benchmark o
+    # servidor roda com loop/parsers em C e múltiplos workers
+    uvicorn.run(
+        "local_agent_server:app",
+        host="0.0.0.0",
+        port=8001,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("LOCAL_AGENT_WORKERS", "4")),
+        reload=False,
+        log_level="warning",
+    )
@@ -2,11 +2,15 @@
 Adapter para OpenAI API
 """
 
-import httpx
+import aiohttp
+import asyncio
+import orjson
 import os
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator
 from pydantic import BaseModel
 from .base import AgentInterface
+from .session import get_session
+from .cache import llm_cache
 
 
 class OpenAIConfig(BaseModel):
@@ -14,46 +18,95 @@ class OpenAIConfig(BaseModel):
     model: str = "gpt-4-turbo"
     temperature: float = 0.7
     max_tokens: int = 1024
+    timeout: float = 30.0
+    max_connections: int = 2000
+    max_keepalive_connections: int = 500
+    max_inflight: int = 500
 
 
 class OpenAIAgentAdapter(AgentInterface):
     def __init__(self, config: OpenAIConfig):
         self.config = config
-        self.client = httpx.AsyncClient(
-            headers={"Authorization": f"Bearer {config.api_key}"}, timeout=30.0
-        )
+        self._headers = {
+            "Authorization": f"Bearer {config.api_key}",
+            "Content-Type": "application/json",
+        }
+        self._timeout = config.timeout
+        # Limita requisições em voo para não enfileirar além do pool
+        self._sem = asyncio.Semaphore(config.max_inflight)
+        self._url = "https://api.openai.com/v1/chat/completions"
+        self._payload_template = {
+            "model": config.model,
+            "temperature": config.temperature,
+            "max_tokens": config.max_tokens,
+        }
 
     async def query(
         self, prompt: str, context: Dict[str, Any] = None
     ) -> Dict[str, Any]:
-        payload = {
-            "model": self.config.model,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": self.config.temperature,
-            "max_tokens": self.config.max_tokens,
-        }
+        cache_key = llm_cache.make_key(
+            self.config.model, prompt, self.config.temperature, self.config.max_tokens
+        )
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        payload = self._payload_template.copy()
+        payload["messages"] = [{"role": "user", "content": prompt}]
 
         try:
-            response = await self.client.post(
-                "https://api.openai.com/v1/chat/completions", json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
+            session = await get_session()
+            start_time = asyncio.get_event_loop().time()
+            async with self._sem, asyncio.timeout(self._timeout), session.post(
+                self._url,
+                data=orjson.dumps(payload),
+                headers=self._headers,
+            ) as response:
+                if response.status >= 400:
+                    return {
+                        "error": f"API Error {response.status}",
+                        "raw_response": await response.text(),
+                    }
+                data = orjson.loads(await response.read())
+            end_time = asyncio.get_event_loop().time()
 
-            return {
+            result = {
                 "response": data["choices"][0]["message"]["content"],
                 "usage": data["usage"],
-                "latency": response.elapsed.total_seconds(),
+                "latency": end_time - start_time,
             }
+            llm_cache.set(cache_key, result)
+            return result
 
-        except httpx.HTTPStatusError as e:
-            return {
-                "error": f"API Error {e.response.status_code}",
-                "raw_response": e.response.text,
-            }
         except Exception as e:
             return {"error": str(e)}
 
+    async def query_stream(
+        self, prompt: str, context: Dict[str, Any] = None
+    ) -> AsyncIterator[str]:
+        """Emite a resposta incrementalmente via SSE (stream=True)"""
+        payload = self._payload_template.copy()
+        payload["messages"] = [{"role": "user", "content": prompt}]
+        payload["stream"] = True
+
+        session = await get_session()
+        async with asyncio.timeout(self._timeout), session.post(
+            self._url,
+            data=orjson.dumps(payload),
+            headers=self._headers,
+        ) as response:
+            response.raise_for_status()
+            async for raw_line in response.content:
+                line = raw_line.strip()
+                if not line.startswith(b"data: "):
+                    continue
+                chunk = line[6:]
+                if chunk == b"[DONE]":
+                    break
+                delta = orjson.loads(chunk)["choices"][0]["delta"].get("content", "")
+                if delta:
+                    yield delta
+
     def get_info(self) -> Dict[str, Any]:
         return {
             "name": "openai",
@@ -0,0 +1,44 @@
+"""
+Sessão HTTP compartilhada entre os adapters
+"""
+
+import asyncio
+import aiohttp
+from typing import Dict
+
+# Limites do pool de conexões compartilhado
+MAX_CONNECTIONS = 2000
+MAX_CONNECTIONS_PER_HOST = 500
+KEEPALIVE_TIMEOUT = 75.0
+
+# Uma sessão por event loop: a ClientSession fica presa ao loop que a
+# criou, e cada task do worker roda em um asyncio.run próprio — reusar a
+# sessão de um loop já encerrado falha com "Event loop is closed"
+_sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Obtém (criando se necessário) a sessão aiohttp do loop corrente"""
+    loop = asyncio.get_running_loop()
+
+    # Descartar entradas de loops já encerrados para não acumular
+    for stale_loop in [l for l in _sessions if l.is_closed()]:
+        del _sessions[stale_loop]
+
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=MAX_CONNECTIONS,
+            limit_per_host=MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+        session = aiohttp.ClientSession(connector=connector)
+        _sessions[loop] = session
+    return session
+
+
+async def close_session():
+    """Fecha a sessão do loop corrente e libera o pool de conexões"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
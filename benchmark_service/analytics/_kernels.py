@@ -0,0 +1,76 @@
+"""
+Kernels numéricos vetorizados para o sistema de analytics
+"""
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # Numba é opcional; sem ele usamos o fallback NumPy
+    numba = None
+
+
+def composite_scores(
+    accuracy: np.ndarray, latency: np.ndarray, consistency: np.ndarray
+) -> np.ndarray:
+    """Calcula o score composto de todos os agents em uma expressão"""
+    return accuracy * 0.5 + np.maximum(0.0, (10.0 - latency) * 2.0) + consistency * 0.3
+
+
+def tokens_per_sec(tokens: np.ndarray, latency: np.ndarray) -> np.ndarray:
+    """Calcula tokens por segundo por agent, com 0 para entradas inválidas"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where((latency > 0) & (tokens > 0), tokens / latency, 0.0)
+
+
+if numba is not None:
+
+    @numba.njit(cache=True, fastmath=True, nogil=True)
+    def lloyd_cluster(X, centers, n_iter):
+        # Lloyd clássico em loops escalares que o LLVM baixa para código
+        # SIMD; nogil=True libera o GIL durante o cluster, então pools de
+        # threads/prefork não serializam nesta etapa
+        n_rows, n_dims = X.shape
+        k = centers.shape[0]
+        labels = np.zeros(n_rows, dtype=np.int64)
+        counts = np.zeros(k, dtype=np.int64)
+        sums = np.zeros((k, n_dims), dtype=np.float64)
+
+        for _ in range(n_iter):
+            changed = False
+            for i in range(n_rows):
+                best = 0
+                best_dist = np.inf
+                for j in range(k):
+                    dist = 0.0
+                    for d in range(n_dims):
+                        diff = X[i, d] - centers[j, d]
+                        dist += diff * diff
+                    if dist < best_dist:
+                        best_dist = dist
+                        best = j
+                if labels[i] != best:
+                    changed = True
+                    labels[i] = best
+
+            counts[:] = 0
+            sums[:] = 0.0
+            for i in range(n_rows):
+                counts[labels[i]] += 1
+                for d in range(n_dims):
+                    sums[labels[i], d] += X[i, d]
+            for j in range(k):
+                if counts[j] > 0:
+                    for d in range(n_dims):
+                        centers[j, d] = sums[j, d] / counts[j]
+
+            if not changed:
+                break
+
+        return labels, centers
+
+else:
+    # Sem Numba o chamador cai no KMeans do sklearn
+    lloyd_cluster = None
+
+
@@ -2,19 +2,32 @@
 Sistema de analytics para análise de benchmarks
 """
 
-import pandas as pd
+import functools
+import os
+import orjson
 import numpy as np
 from typing import Dict, Any, List
 from datetime import datetime
-from collections import defaultdict
-import json
+from collections import deque
+from ._kernels import composite_scores, tokens_per_sec
+
+# Limiares e rótulos para classificação vetorizada
+_ACCURACY_BINS = np.array([70.0, 80.0, 90.0])
+_ACCURACY_LABELS = np.array(["Poor", "Fair", "Good", "Excellent"])
+_LATENCY_BINS = np.array([1.0, 3.0, 5.0])
+_LATENCY_LABELS = np.array(["Excellent", "Good", "Fair", "Poor"])
 
 
 class BenchmarkAnalytics:
     """Sistema de analytics para benchmarks"""
 
     def __init__(self):
-        self.metrics_history = []
+        # Ring buffer limitado: análises antigas são descartadas em O(1)
+        self.metrics_history = deque(
+            maxlen=int(os.getenv("ANALYTICS_HISTORY_MAX", "1024"))
+        )
+        history_path = os.getenv("ANALYTICS_HISTORY_PATH")
+        self._history_log = open(history_path, "ab") if history_path else None
 
     def analyze_benchmark_results(
         self, benchmark_results: Dict[str, Any]
@@ -33,85 +46,113 @@ class BenchmarkAnalytics:
             "insights": [],
         }
 
+        # Extrair métricas uma única vez em arrays paralelos (SoA)
+        agents = benchmark_results["agents"]
+        soa = self._extract_soa(agents)
+
         # Análise de métricas de performance
-        performance_metrics = self._analyze_performance_metrics(
-            benchmark_results["agents"]
-        )
+        performance_metrics = self._analyze_performance_metrics(agents, soa)
         analysis["performance_metrics"] = performance_metrics
 
         # Análise comparativa
-        comparative_analysis = self._compare_agents(benchmark_results["agents"])
+        comparative_analysis = self._compare_agents(agents, soa)
         analysis["comparative_analysis"] = comparative_analysis
 
         # Sumário estatístico
-        statistical_summary = self._generate_statistical_summary(
-            benchmark_results["agents"]
-        )
+        statistical_summary = self._generate_statistical_summary(agents)
         analysis["statistical_summary"] = statistical_summary
 
         # Insights automáticos
-        insights = self._generate_insights(
-            benchmark_results["agents"], performance_metrics
-        )
+        insights = self._generate_insights(agents, performance_metrics, soa)
         analysis["insights"] = insights
 
-        # Armazenar no histórico
+        # Armazenar no histórico (e opcionalmente em JSONL append-only)
         self.metrics_history.append(analysis)
+        if self._history_log is not None:
+            self._history_log.write(
+                orjson.dumps(analysis, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+            )
 
         return analysis
 
+    def _extract_soa(self, agents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Extrai as métricas dos agents em arrays paralelos (layout SoA)"""
+        n = len(agents)
+        metrics = [agent.get("metrics", {}) for agent in agents]
+
+        return {
+            "ids": [agent["id"] for agent in agents],
+            "accuracy": np.fromiter(
+                (m.get("accuracy", 0) for m in metrics), dtype=float, count=n
+            ),
+            "latency": np.fromiter(
+                (m.get("latency_avg", 0) for m in metrics), dtype=float, count=n
+            ),
+            "tokens": np.fromiter(
+                (m.get("tokens_avg", 0) for m in metrics), dtype=float, count=n
+            ),
+            "consistency": np.fromiter(
+                (m.get("consistency", 0) for m in metrics), dtype=float, count=n
+            ),
+        }
+
     def _analyze_performance_metrics(
-        self, agents: List[Dict[str, Any]]
+        self, agents: List[Dict[str, Any]], soa: Dict[str, Any] = None
     ) -> Dict[str, Any]:
         """Analisa métricas de performance individuais"""
+        if soa is None:
+            soa = self._extract_soa(agents)
+
+        # Classificar todos os agents de uma vez (branchless)
+        accuracy_ratings, latency_ratings = self._rate_arrays(
+            soa["accuracy"], soa["latency"]
+        )
+        tokens_per_second = tokens_per_sec(soa["tokens"], soa["latency"])
+
         metrics_analysis = {}
 
-        for agent in agents:
-            agent_id = agent["id"]
-            metrics = agent.get("metrics", {})
+        for i, agent_id in enumerate(soa["ids"]):
+            accuracy = soa["accuracy"][i]
+            latency = soa["latency"][i]
+            tokens = soa["tokens"][i]
 
             metrics_analysis[agent_id] = {
                 "accuracy_analysis": {
-                    "value": metrics.get("accuracy", 0),
-                    "rating": self._rate_accuracy(metrics.get("accuracy", 0)),
+                    "value": accuracy,
+                    "rating": accuracy_ratings[i],
                 },
                 "latency_analysis": {
-                    "value": metrics.get("latency_avg", 0),
-                    "rating": self._rate_latency(metrics.get("latency_avg", 0)),
+                    "value": latency,
+                    "rating": latency_ratings[i],
                 },
                 "efficiency_analysis": {
-                    "tokens_per_second": self._calculate_tokens_per_second(
-                        metrics.get("tokens_avg", 0), metrics.get("latency_avg", 0)
-                    ),
+                    "tokens_per_second": tokens_per_second[i],
                     "cost_efficiency": self._calculate_cost_efficiency(
-                        metrics.get("accuracy", 0), metrics.get("tokens_avg", 0)
+                        accuracy, tokens
                     ),
                 },
             }
 
         return metrics_analysis
 
-    def _compare_agents(self, agents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _compare_agents(
+        self, agents: List[Dict[str, Any]], soa: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
         """Compara performance entre agents"""
         if len(agents) < 2:
             return {"comparison_not_available": "Need at least 2 agents for comparison"}
 
+        if soa is None:
+            soa = self._extract_soa(agents)
+
         # Encontrar melhor desempenho em cada métrica
-        accuracy_scores = {
-            agent["id"]: agent["metrics"].get("accuracy", 0) for agent in agents
-        }
-        latency_scores = {
-            agent["id"]: agent["metrics"].get("latency_avg", 0) for agent in agents
-        }
-        tokens_scores = {
-            agent["id"]: agent["metrics"].get("tokens_avg", 0) for agent in agents
-        }
+        ids = soa["ids"]
 
         return {
-            "best_accuracy": max(accuracy_scores, key=accuracy_scores.get),
-            "best_latency": min(latency_scores, key=latency_scores.get),
-            "most_efficient": min(tokens_scores, key=tokens_scores.get),
-            "performance_ranking": self._rank_agents_by_performance(agents),
+            "best_accuracy": ids[int(np.argmax(soa["accuracy"]))],
+            "best_latency": ids[int(np.argmin(soa["latency"]))],
+            "most_efficient": ids[int(np.argmin(soa["tokens"]))],
+            "performance_ranking": self._rank_agents_by_performance(agents, soa),
         }
 
     def _generate_statistical_summary(
@@ -121,100 +162,120 @@ class BenchmarkAnalytics:
         if not agents:
             return {}
 
-        metrics_collection = defaultdict(list)
-
-        # Coletar todas as métricas
-        for agent in agents:
-            metrics = agent.get("metrics", {})
-            for key, value in metrics.items():
-                metrics_collection[key].append(value)
-
-        # Calcular estatísticas
-        statistical_summary = {}
-        for metric, values in metrics_collection.items():
-            if values:
-                statistical_summary[metric] = {
-                    "mean": np.mean(values),
-                    "median": np.median(values),
-                    "std_dev": np.std(values),
-                    "min": np.min(values),
-                    "max": np.max(values),
-                }
+        # Um array NumPy por métrica (NaN para ausentes) e as estatísticas
+        # calculadas direto nos loops C do NumPy, sem montar DataFrame
+        metrics = [agent.get("metrics", {}) for agent in agents]
+        keys = list(dict.fromkeys(key for m in metrics for key in m))
+        if not keys:
+            return {}
 
-        return statistical_summary
+        summary = {}
+        for key in keys:
+            values = np.fromiter(
+                (m.get(key, np.nan) for m in metrics),
+                dtype=np.float64,
+                count=len(metrics),
+            )
+            summary[key] = {
+                "mean": float(np.nanmean(values)),
+                "median": float(np.nanmedian(values)),
+                "std_dev": float(np.nanstd(values)),
+                "min": float(np.nanmin(values)),
+                "max": float(np.nanmax(values)),
+            }
+        return summary
 
     def _generate_insights(
-        self, agents: List[Dict[str, Any]], performance_metrics: Dict[str, Any]
+        self,
+        agents: List[Dict[str, Any]],
+        performance_metrics: Dict[str, Any],
+        soa: Dict[str, Any] = None,
     ) -> List[str]:
         """Gera insights automáticos baseados nos resultados"""
+        if soa is None:
+            soa = self._extract_soa(agents)
+
+        ids = soa["ids"]
+        accuracy = soa["accuracy"]
+        latency = soa["latency"]
+        tps = tokens_per_sec(soa["tokens"], latency)
+
         insights = []
 
-        for agent in agents:
-            agent_id = agent["id"]
-            metrics = agent.get("metrics", {})
-            accuracy = metrics.get("accuracy", 0)
-            latency = metrics.get("latency_avg", 0)
-            tokens = metrics.get("tokens_avg", 0)
-
-            # Insights baseados em accuracy
-            if accuracy >= 90:
-                insights.append(f"{agent_id} demonstra excelente precisão (≥90%)")
-            elif accuracy >= 80:
-                insights.append(f"{agent_id} mostra boa precisão (80-89%)")
-            elif accuracy < 70:
-                insights.append(f"{agent_id} precisa de melhorias na precisão (<70%)")
-
-            # Insights baseados em latência
-            if latency <= 2.0:
-                insights.append(f"{agent_id} tem excelente tempo de resposta (≤2s)")
-            elif latency > 5.0:
-                insights.append(f"{agent_id} apresenta latência alta (>5s)")
-
-            # Insights baseados em eficiência
-            tokens_per_second = self._calculate_tokens_per_second(tokens, latency)
-            if tokens_per_second > 500:
-                insights.append(
-                    f"{agent_id} é muito eficiente em processamento de tokens"
-                )
-            elif tokens_per_second < 100:
-                insights.append(
-                    f"{agent_id} poderia ser mais eficiente no processamento de tokens"
-                )
+        # Insights baseados em accuracy
+        insights.extend(
+            f"{ids[i]} demonstra excelente precisão (≥90%)"
+            for i in np.flatnonzero(accuracy >= 90)
+        )
+        insights.extend(
+            f"{ids[i]} mostra boa precisão (80-89%)"
+            for i in np.flatnonzero((accuracy >= 80) & (accuracy < 90))
+        )
+        insights.extend(
+            f"{ids[i]} precisa de melhorias na precisão (<70%)"
+            for i in np.flatnonzero(accuracy < 70)
+        )
+
+        # Insights baseados em latência
+        insights.extend(
+            f"{ids[i]} tem excelente tempo de resposta (≤2s)"
+            for i in np.flatnonzero(latency <= 2.0)
+        )
+        insights.extend(
+            f"{ids[i]} apresenta latência alta (>5s)"
+            for i in np.flatnonzero(latency > 5.0)
+        )
+
+        # Insights baseados em eficiência
+        insights.extend(
+            f"{ids[i]} é muito eficiente em processamento de tokens"
+            for i in np.flatnonzero(tps > 500)
+        )
+        insights.extend(
+            f"{ids[i]} poderia ser mais eficiente no processamento de tokens"
+            for i in np.flatnonzero(tps < 100)
+        )
 
         return insights
 
     def _rank_agents_by_performance(
-        self, agents: List[Dict[str, Any]]
+        self, agents: List[Dict[str, Any]], soa: Dict[str, Any] = None
     ) -> List[Dict[str, Any]]:
         """Classifica agents por performance geral"""
-        ranked_agents = []
-
-        for agent in agents:
-            agent_id = agent["id"]
-            metrics = agent.get("metrics", {})
-
-            # Calcular score composto (simplificado)
-            accuracy_score = metrics.get("accuracy", 0) * 0.5
-            latency_score = max(
-                0, (10 - metrics.get("latency_avg", 0)) * 2
-            )  # Normalizado
-            consistency_score = metrics.get("consistency", 0) * 0.3
-
-            composite_score = accuracy_score + latency_score + consistency_score
-
-            ranked_agents.append(
-                {
-                    "agent_id": agent_id,
-                    "composite_score": composite_score,
-                    "accuracy": metrics.get("accuracy", 0),
-                    "latency": metrics.get("latency_avg", 0),
-                    "consistency": metrics.get("consistency", 0),
-                }
-            )
-
-        # Ordenar por score composto
-        ranked_agents.sort(key=lambda x: x["composite_score"], reverse=True)
-        return ranked_agents
+        if soa is None:
+            soa = self._extract_soa(agents)
+
+        accuracy = soa["accuracy"]
+        latency = soa["latency"]
+        consistency = soa["consistency"]
+
+        # Calcular score composto (simplificado) de forma vetorizada
+        scores = composite_scores(accuracy, latency, consistency)
+
+        # Ordenar por score composto (ordem estável preserva empates)
+        order = np.argsort(-scores, kind="stable")
+
+        ids = soa["ids"]
+        return [
+            {
+                "agent_id": ids[i],
+                "composite_score": scores[i],
+                "accuracy": accuracy[i],
+                "latency": latency[i],
+                "consistency": consistency[i],
+            }
+            for i in order
+        ]
+
+    def _rate_arrays(self, accuracies: np.ndarray, latencies: np.ndarray):
+        """Classifica accuracy e latência de todos os agents de uma vez"""
+        accuracy_ratings = _ACCURACY_LABELS[
+            np.searchsorted(_ACCURACY_BINS, accuracies, side="right")
+        ]
+        latency_ratings = _LATENCY_LABELS[
+            np.searchsorted(_LATENCY_BINS, latencies, side="left")
+        ]
+        return accuracy_ratings, latency_ratings
 
     def _rate_accuracy(self, accuracy: float) -> str:
         """Avalia a precisão"""
@@ -253,5 +314,11 @@ class BenchmarkAnalytics:
         return normalized_accuracy / (tokens / 1000) if tokens > 0 else 0
 
 
+@functools.lru_cache(maxsize=1)
+def get_analytics() -> BenchmarkAnalytics:
+    """Fábrica preguiçosa da instância compartilhada (substituível em testes)"""
+    return BenchmarkAnalytics()
+
+
 # Instância global
-benchmark_analytics = BenchmarkAnalytics()
+benchmark_analytics = get_analytics()
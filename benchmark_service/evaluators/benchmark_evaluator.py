@@ -2,10 +2,25 @@
 Evaluators para análise de resultados de benchmarks
 """
 
-from typing import Dict, Any, List
+import functools
+
+from typing import Dict, Any, List, Tuple
 from collections import defaultdict
 
 
+@functools.lru_cache(maxsize=4096)
+def _score_text(text: str) -> Tuple[float, float, float]:
+    """Scores heurísticos (coerência, relevância, completude) de um texto
+
+    O cálculo é determinístico por conteúdo, então memoizar por texto faz
+    respostas idênticas — comuns em retries e modelos determinísticos —
+    custarem um lookup em vez de re-pontuar. Tupla imutável para o
+    lru_cache.
+    """
+    base = min(5.0, len(text) / 100.0)  # Simplificação
+    return round(base, 2), round(base * 0.9, 2), round(base * 0.8, 2)
+
+
 class BenchmarkEvaluator:
     """Avaliador de resultados de benchmarks"""
 
@@ -14,67 +29,36 @@ class BenchmarkEvaluator:
         if not results:
             return {}
 
-        # Organizar resultados por agent
-        agent_stats = defaultdict(
-            lambda: {
-                "total_questions": 0,
-                "correct_answers": 0,
-                "total_latency": 0.0,
-                "total_tokens": 0,
-                "errors": 0,
-            }
-        )
-
-        # Processar cada resultado
+        # Uma única passada com acumuladores escalares de tamanho fixo por
+        # agent: [corretas, erros, soma de latência, soma de tokens, n].
+        # O custo dominante aqui é lookup de dict por célula; acumular
+        # direto evita materializar listas intermediárias para reduzir
+        per_agent = defaultdict(lambda: [0, 0, 0.0, 0, 0])
         for result in results:
             for agent_response in result.get("agent_responses", []):
-                agent_name = agent_response["agent"]
-                stats = agent_stats[agent_name]
-
-                stats["total_questions"] += 1
-
+                stats = per_agent[agent_response["agent"]]
                 if "error" in agent_response:
-                    stats["errors"] += 1
+                    stats[1] += 1
                 else:
+                    response_data = agent_response.get("response")
+                    if isinstance(response_data, dict):
+                        stats[2] += response_data.get("latency", 0.0)
+                        usage = response_data.get("usage")
+                        if usage:
+                            stats[3] += usage.get("total_tokens", 0)
                     if agent_response.get("correct", False):
-                        stats["correct_answers"] += 1
+                        stats[0] += 1
+                stats[4] += 1
 
-                    # Coletar métricas de desempenho
-                    response_data = agent_response.get("response", {})
-                    if isinstance(response_data, dict):
-                        if "latency" in response_data:
-                            stats["total_latency"] += response_data["latency"]
-                        if (
-                            "usage" in response_data
-                            and "total_tokens" in response_data["usage"]
-                        ):
-                            stats["total_tokens"] += response_data["usage"][
-                                "total_tokens"
-                            ]
-
-        # Calcular métricas finais
         evaluated_results = {}
-        for agent_name, stats in agent_stats.items():
-            accuracy = (
-                (stats["correct_answers"] / stats["total_questions"] * 100)
-                if stats["total_questions"] > 0
-                else 0
-            )
-            avg_latency = (
-                (stats["total_latency"] / stats["total_questions"])
-                if stats["total_questions"] > 0
-                else 0
-            )
-            avg_tokens = (
-                (stats["total_tokens"] / stats["total_questions"])
-                if stats["total_questions"] > 0
-                else 0
-            )
-            error_rate = (
-                (stats["errors"] / stats["total_questions"] * 100)
-                if stats["total_questions"] > 0
-                else 0
-            )
+        for agent_name, stats in per_agent.items():
+            correct_answers, error_count, total_latency, total_tokens, n = stats
+            total_questions = n
+
+            accuracy = correct_answers / total_questions * 100
+            avg_latency = total_latency / total_questions
+            avg_tokens = total_tokens / total_questions
+            error_rate = error_count / total_questions * 100
 
             evaluated_results[agent_name] = {
                 "metrics": {
@@ -84,7 +68,13 @@ class BenchmarkEvaluator:
                     "error_rate": round(error_rate, 2),
                     "consistency": round(100 - error_rate, 2),  # Simplificação
                 },
-                "raw_stats": stats,
+                "raw_stats": {
+                    "total_questions": total_questions,
+                    "correct_answers": correct_answers,
+                    "total_latency": total_latency,
+                    "total_tokens": int(total_tokens),
+                    "errors": error_count,
+                },
             }
 
         return evaluated_results
@@ -98,27 +88,31 @@ class LLMEvaluator:
         # Esta é uma implementação simplificada
         # Em produção, isso faria chamadas reais para um modelo de julgamento
 
+        if not responses:
+            return {}
+
+        # Simulação de avaliação de qualidade, memoizada por texto de
+        # resposta. Em produção, isso usaria um modelo real
         quality_scores = {}
         for response in responses:
-            agent_name = response.get("agent", "unknown")
-            response_text = (
-                response.get("response", {}).get("response", "")
-                if isinstance(response.get("response"), dict)
-                else ""
+            coherence, relevance, completeness = _score_text(
+                self._extract_text(response)
             )
-
-            # Simulação de avaliação de qualidade
-            # Em produção, isso usaria um modelo real
-            quality_score = min(5.0, len(response_text) / 100.0)  # Simplificação
-
-            quality_scores[agent_name] = {
-                "coherence": round(quality_score, 2),
-                "relevance": round(quality_score * 0.9, 2),
-                "completeness": round(quality_score * 0.8, 2),
+            quality_scores[response.get("agent", "unknown")] = {
+                "coherence": coherence,
+                "relevance": relevance,
+                "completeness": completeness,
             }
-
         return quality_scores
 
+    @staticmethod
+    def _extract_text(response: Dict[str, Any]) -> str:
+        """Extrai o texto da resposta, tolerando formatos inesperados"""
+        response_data = response.get("response")
+        if isinstance(response_data, dict):
+            return response_data.get("response", "")
+        return ""
+
 
 # Instâncias globais
 benchmark_evaluator = BenchmarkEvaluator()
@@ -2,30 +2,178 @@
 Serviço principal de benchmark
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
+import asyncio
+import math
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
-import psycopg2
-from psycopg2.extras import RealDictCursor
+import asyncpg
+from psycopg2.extensions import make_dsn, register_adapter
+from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.extras import Json, RealDictCursor, register_default_jsonb
 import os
-import json
+import orjson
+
+
+# A saída do analytics carrega escalares NumPy (reduções float32/64) e
+# clusters com chave int; estas opções cobrem ambos na fronteira do banco
+_JSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _json_dumps(obj) -> str:
+    """Serializa para JSON tolerando tipos NumPy e chaves não-string"""
+    return orjson.dumps(obj, option=_JSON_OPTS).decode()
+
+
+class _OrjsonJson(Json):
+    """Adapter de dict -> jsonb usando o encoder C do orjson"""
+
+    def dumps(self, obj):
+        return _json_dumps(obj)
+
+
+# Colunas jsonb voltam já decodificadas (parse via orjson) e dicts Python
+# ligados a parâmetros são adaptados direto pelo driver, sem pré-serialização
+register_adapter(dict, _OrjsonJson)
+register_default_jsonb(globally=True, loads=orjson.loads)
+
+# Parâmetros de conexão resolvidos uma única vez no import do módulo,
+# em vez de cinco os.getenv por instância de serviço
+_DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "database": os.getenv("DB_NAME", "benchmark_db"),
+    "user": os.getenv("DB_USER", "benchmark_user"),
+    "password": os.getenv("DB_PASSWORD", "benchmark_password"),
+    "port": os.getenv("DB_PORT", "5432"),
+}
+
+# DSN libpq já montado: psycopg2 recebe a conninfo pronta e não precisa
+# re-formatar kwargs em string a cada conexão nova do pool
+DB_DSN = make_dsn(
+    host=_DB_CONFIG["host"],
+    dbname=_DB_CONFIG["database"],
+    user=_DB_CONFIG["user"],
+    password=_DB_CONFIG["password"],
+    port=_DB_CONFIG["port"],
+)
+
+# Statements constantes do serviço. asyncpg prepara e cacheia statements por
+# texto de query em cada conexão do pool; manter um único objeto str por
+# statement garante o hit de cache e evita re-parse/re-plan no servidor
+_SQL_INSERT_BENCHMARK = """
+    INSERT INTO benchmarks (run_id, status, agents, benchmark_type,
+    config, created_at)
+    VALUES ($1, $2, $3, $4, $5, $6)
+"""
+_SQL_SELECT_BENCHMARK = """
+    SELECT * FROM benchmarks WHERE run_id = %s
+"""
+_SQL_START_PROCESSING = """
+    UPDATE benchmarks
+    SET status = $1, started_at = $2, progress = $3
+    WHERE run_id = $4
+    RETURNING run_id, status, progress, started_at
+"""
+_SQL_UPDATE_PROGRESS = """
+    UPDATE benchmarks
+    SET progress = $1
+    WHERE run_id = $2
+"""
+_SQL_COMPLETE_BENCHMARK = """
+    UPDATE benchmarks
+    SET status = $1, completed_at = $2, progress = $3
+    WHERE run_id = $4
+    RETURNING run_id, status, progress, completed_at
+"""
+# CTE gravável: o UPDATE de status e o INSERT do histórico de analytics
+# saem em um único statement (e um único round-trip) quando há análise
+_SQL_COMPLETE_WITH_ANALYTICS = """
+    WITH upd AS (
+        UPDATE benchmarks
+        SET status = $1, completed_at = $2, progress = $3
+        WHERE run_id = $4
+        RETURNING run_id, status, progress, completed_at
+    ), ins AS (
+        INSERT INTO analytics_history (run_id, analysis, deductions)
+        SELECT run_id, $5, $6 FROM upd
+    )
+    SELECT run_id, status, progress, completed_at FROM upd
+"""
+_SQL_INSERT_RESULTS = """
+    INSERT INTO benchmark_results (run_id, agent_id, metrics, category_scores)
+    VALUES ($1, $2, $3, $4)
+"""
+_SQL_FAIL_BENCHMARK = """
+    UPDATE benchmarks
+    SET status = $1, completed_at = $2
+    WHERE run_id = $3
+    RETURNING run_id, status, completed_at
+"""
+
+# Intervalo do flush de progresso em lote (segundos)
+_PROGRESS_FLUSH_INTERVAL = 0.25
 
 
 class BenchmarkService:
     """Serviço principal para gerenciar benchmarks"""
 
     def __init__(self):
-        self.db_config = {
-            "host": os.getenv("DB_HOST", "localhost"),
-            "database": os.getenv("DB_NAME", "benchmark_db"),
-            "user": os.getenv("DB_USER", "benchmark_user"),
-            "password": os.getenv("DB_PASSWORD", "benchmark_password"),
-            "port": os.getenv("DB_PORT", "5432"),
-        }
-
-    def _get_db_connection(self):
-        """Obtém conexão com o banco de dados"""
-        return psycopg2.connect(**self.db_config)
+        self.db_config = _DB_CONFIG
+        # Pools criados sob demanda: abrir conexões no __init__ penalizaria o
+        # import do módulo e quebraria ambientes sem banco disponível.
+        # O pool síncrono (psycopg2) atende as leituras; as escritas async
+        # usam asyncpg para não bloquear o event loop do FastAPI
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._async_pool: Optional[asyncpg.Pool] = None
+        # Progresso pendente por run_id: os workers emitem muito mais
+        # atualizações do que os clientes observam; só o valor mais
+        # recente de cada run é gravado, em lotes periódicos
+        self._pending_progress: Dict[str, float] = {}
+        # Último progresso aceito por run: atualizações que não mudam o
+        # valor (dentro de 0,1%) nem chegam à fila de flush
+        self._last_progress: Dict[str, float] = {}
+        # Runs já finalizados: progresso enfileirado (ou em voo) antes da
+        # conclusão não pode sobrescrever o valor terminal gravado por
+        # complete/fail_benchmark
+        self._finalized: Set[str] = set()
+        # Serializa o UPDATE em lote do flusher com os UPDATEs terminais
+        self._flush_lock = asyncio.Lock()
+        self._progress_flusher: Optional[asyncio.Task] = None
+
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """Obtém (criando na primeira chamada) o pool de conexões"""
+        if self._pool is None:
+            self._pool = ThreadedConnectionPool(minconn=4, maxconn=32, dsn=DB_DSN)
+        return self._pool
+
+    @contextmanager
+    def _conn(self):
+        """Empresta uma conexão do pool e a devolve ao final do bloco
+
+        Reutilizar conexões vivas evita pagar handshake TCP/TLS +
+        autenticação do Postgres em cada chamada.
+        """
+        pool = self._get_pool()
+        conn = pool.getconn()
+        try:
+            yield conn
+        finally:
+            pool.putconn(conn)
+
+    async def _get_async_pool(self) -> asyncpg.Pool:
+        """Obtém (criando na primeira chamada) o pool asyncpg"""
+        if self._async_pool is None:
+            self._async_pool = await asyncpg.create_pool(
+                host=self.db_config["host"],
+                database=self.db_config["database"],
+                user=self.db_config["user"],
+                password=self.db_config["password"],
+                port=int(self.db_config["port"]),
+                min_size=4,
+                max_size=32,
+            )
+        return self._async_pool
 
     async def start_benchmark(
         self, agents: List[str], benchmark: str, config: Dict[str, Any] = None
@@ -34,26 +182,21 @@ class BenchmarkService:
         run_id = str(uuid.uuid4())
 
         try:
-            conn = self._get_db_connection()
-            cursor = conn.cursor()
-
             # Convert Python objects to JSON strings for database insertion
-            agents_json = json.dumps(agents) if agents else None
-            config_json = json.dumps(config) if config else None
-
-            cursor.execute(
-                """
-                INSERT INTO benchmarks (run_id, status, agents, benchmark_type,
-                config, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """,
-                (run_id, "queued", agents_json, benchmark, config_json, datetime.now()),
+            agents_json = orjson.dumps(agents).decode() if agents else None
+            config_json = orjson.dumps(config).decode() if config else None
+
+            pool = await self._get_async_pool()
+            await pool.execute(
+                _SQL_INSERT_BENCHMARK,
+                run_id,
+                "queued",
+                agents_json,
+                benchmark,
+                config_json,
+                datetime.now(),
             )
 
-            conn.commit()
-            cursor.close()
-            conn.close()
-
             return run_id
         except Exception as e:
             print(f"Erro ao iniciar benchmark: {e}")
@@ -62,19 +205,11 @@ class BenchmarkService:
     def get_run_status(self, run_id: str) -> Optional[Dict[str, Any]]:
         """Obtém status de um benchmark"""
         try:
-            conn = self._get_db_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-            cursor.execute(
-                """
-                SELECT * FROM benchmarks WHERE run_id = %s
-            """,
-                (run_id,),
-            )
-
-            result = cursor.fetchone()
-            cursor.close()
-            conn.close()
+            with self._conn() as conn, conn.cursor(
+                cursor_factory=RealDictCursor
+            ) as cursor:
+                cursor.execute(_SQL_SELECT_BENCHMARK, (run_id,))
+                result = cursor.fetchone()
 
             if result:
                 # Convert JSON strings back to Python objects
@@ -82,11 +217,11 @@ class BenchmarkService:
                 if result_dict.get("agents"):
                     # Check if it's already a Python object or a JSON string
                     if isinstance(result_dict["agents"], str):
-                        result_dict["agents"] = json.loads(result_dict["agents"])
+                        result_dict["agents"] = orjson.loads(result_dict["agents"])
                 if result_dict.get("config"):
                     # Check if it's already a Python object or a JSON string
                     if isinstance(result_dict["config"], str):
-                        result_dict["config"] = json.loads(result_dict["config"])
+                        result_dict["config"] = orjson.loads(result_dict["config"])
 
                 # Map database fields to expected API fields
                 result_dict["benchmark"] = result_dict.pop("benchmark_type", "")
@@ -99,123 +234,194 @@ class BenchmarkService:
             print(f"Erro ao obter status do benchmark: {e}")
             return None
 
-    async def start_processing(self, run_id: str):
-        """Marca o benchmark como em processamento"""
+    async def start_processing(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Marca o benchmark como em processamento
+
+        Devolve o estado novo via RETURNING, dispensando o SELECT que o
+        chamador faria em seguida.
+        """
         try:
-            conn = self._get_db_connection()
-            cursor = conn.cursor()
-
-            cursor.execute(
-                """
-                UPDATE benchmarks
-                SET status = %s, started_at = %s, progress = %s
-                WHERE run_id = %s
-            """,
-                ("processing", datetime.now(), 0.0, run_id),
+            pool = await self._get_async_pool()
+            row = await pool.fetchrow(
+                _SQL_START_PROCESSING,
+                "processing",
+                datetime.now(),
+                0.0,
+                run_id,
             )
-
-            conn.commit()
-            cursor.close()
-            conn.close()
+            return dict(row) if row else None
         except Exception as e:
             print(f"Erro ao iniciar processamento do benchmark: {e}")
             raise e
 
     async def update_progress(self, run_id: str, progress: float):
-        """Atualiza o progresso do benchmark"""
-        try:
-            conn = self._get_db_connection()
-            cursor = conn.cursor()
-
-            cursor.execute(
-                """
-                UPDATE benchmarks
-                SET progress = %s
-                WHERE run_id = %s
-            """,
-                (min(1.0, max(0.0, progress)), run_id),
-            )
-
-            conn.commit()
-            cursor.close()
-            conn.close()
-        except Exception as e:
-            print(f"Erro ao atualizar progresso do benchmark: {e}")
-            raise e
-
-    async def complete_benchmark(self, run_id: str, results: Dict[str, Any]):
-        """Completa o benchmark com resultados"""
+        """Registra o progresso do benchmark (coalescido antes de gravar)
+
+        Cada chamada apenas sobrescreve o valor pendente do run; um flusher
+        em background grava o estado mais recente de todos os runs a cada
+        _PROGRESS_FLUSH_INTERVAL em um único UPDATE.
+        """
+        # Clamp com branches (mais barato que min(max(...))) e descarte
+        # de valores repetidos: workers reemitem o mesmo progresso com
+        # frequência e esses não justificam um UPDATE
+        progress = 0.0 if progress < 0.0 else 1.0 if progress > 1.0 else progress
+        if run_id in self._finalized:
+            return
+        last = self._last_progress.get(run_id)
+        if last is not None and math.isclose(progress, last, abs_tol=1e-3):
+            return
+        self._last_progress[run_id] = progress
+        self._pending_progress[run_id] = progress
+        if self._progress_flusher is None or self._progress_flusher.done():
+            self._progress_flusher = asyncio.create_task(self._progress_flush_loop())
+
+    async def _progress_flush_loop(self):
+        """Grava os progressos pendentes em lote até a fila esvaziar"""
+        while self._pending_progress:
+            await asyncio.sleep(_PROGRESS_FLUSH_INTERVAL)
+            await self.flush_progress()
+
+    async def flush_progress(self):
+        """Força a gravação imediata de todos os progressos pendentes
+
+        O lote é montado e gravado sob _flush_lock: complete/fail usam o
+        mesmo lock para o UPDATE terminal, então um flush em voo nunca
+        sobrescreve o progresso de um run que terminou durante o await.
+        """
+        async with self._flush_lock:
+            pending, self._pending_progress = self._pending_progress, {}
+            # Runs finalizados entre o enfileiramento e o flush saem do
+            # lote: o valor terminal já foi (ou será) gravado
+            for run_id in self._finalized.intersection(pending):
+                del pending[run_id]
+            if not pending:
+                return
+
+            try:
+                pool = await self._get_async_pool()
+                if len(pending) == 1:
+                    (run_id, progress), = pending.items()
+                    await pool.execute(_SQL_UPDATE_PROGRESS, progress, run_id)
+                    return
+
+                # Merge CASE-WHEN: um UPDATE cobre todos os runs pendentes
+                run_ids = list(pending)
+                whens = " ".join(
+                    f"WHEN ${2 * i + 1} THEN ${2 * i + 2}::double precision"
+                    for i in range(len(run_ids))
+                )
+                placeholders = ", ".join(f"${2 * i + 1}" for i in range(len(run_ids)))
+                sql = (
+                    f"UPDATE benchmarks SET progress = CASE run_id {whens} END "
+                    f"WHERE run_id IN ({placeholders})"
+                )
+                args = []
+                for run_id in run_ids:
+                    args.append(run_id)
+                    args.append(pending[run_id])
+                await pool.execute(sql, *args)
+            except Exception as e:
+                print(f"Erro ao atualizar progresso do benchmark: {e}")
+                raise e
+
+    async def aclose(self):
+        """Encerra o flusher e fecha o pool asyncpg deste serviço
+
+        Workers criam um serviço por task dentro de asyncio.run; sem
+        fechar o pool aqui, cada task deixaria min_size conexões abertas
+        no Postgres até o processo filho ser reciclado.
+        """
+        if self._progress_flusher is not None and not self._progress_flusher.done():
+            self._progress_flusher.cancel()
+            try:
+                await self._progress_flusher
+            except asyncio.CancelledError:
+                pass
+        self._progress_flusher = None
+
+        if self._async_pool is not None:
+            if self._pending_progress:
+                await self.flush_progress()
+            await self._async_pool.close()
+            self._async_pool = None
+
+    async def complete_benchmark(
+        self, run_id: str, results: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Completa o benchmark com resultados
+
+        Devolve o estado final do run (via RETURNING), poupando o SELECT
+        de verificação no chamador.
+        """
+        # Descartar progresso pendente e marcar o run como finalizado: o
+        # flusher não deve sobrescrever o 1.0, nem com um lote já em voo
+        self._finalized.add(run_id)
+        self._pending_progress.pop(run_id, None)
+        self._last_progress.pop(run_id, None)
         try:
-            conn = self._get_db_connection()
-            cursor = conn.cursor()
-
-            # Atualizar status do benchmark
-            cursor.execute(
-                """
-                UPDATE benchmarks
-                SET status = %s, completed_at = %s, progress = %s
-                WHERE run_id = %s
-            """,
-                ("completed", datetime.now(), 1.0, run_id),
-            )
-
-            # Inserir resultados
-            if "agents" in results:
-                for agent_data in results["agents"]:
-                    # Convert Python objects to JSON strings
-                    metrics_json = json.dumps(agent_data.get("metrics", {}))
-                    category_scores_json = json.dumps(
-                        agent_data.get("category_scores", {})
+            pool = await self._get_async_pool()
+            # Uma única transação: o UPDATE de status, os INSERTs de
+            # resultados e o histórico saem no mesmo flush de rede, com
+            # um commit só no servidor. _flush_lock garante que qualquer
+            # lote de progresso em voo termine antes do UPDATE terminal
+            async with self._flush_lock, pool.acquire() as conn, conn.transaction():
+                if "analysis" in results or "deductions" in results:
+                    # UPDATE + INSERT do histórico fundidos em uma CTE
+                    # gravável: um statement a menos por conclusão
+                    row = await conn.fetchrow(
+                        _SQL_COMPLETE_WITH_ANALYTICS,
+                        "completed",
+                        datetime.now(),
+                        1.0,
+                        run_id,
+                        _json_dumps(results.get("analysis", {})),
+                        _json_dumps(results.get("deductions", {})),
                     )
-
-                    cursor.execute(
-                        """
-                        INSERT INTO benchmark_results (run_id, agent_id, metrics,
-                        category_scores)
-                        VALUES (%s, %s, %s, %s)
-                    """,
-                        (run_id, agent_data["id"], metrics_json, category_scores_json),
+                else:
+                    row = await conn.fetchrow(
+                        _SQL_COMPLETE_BENCHMARK,
+                        "completed",
+                        datetime.now(),
+                        1.0,
+                        run_id,
                     )
 
-            # Inserir análise e deduções se existirem
-            if "analysis" in results or "deductions" in results:
-                # Convert Python objects to JSON strings
-                analysis_json = json.dumps(results.get("analysis", {}))
-                deductions_json = json.dumps(results.get("deductions", {}))
-
-                cursor.execute(
-                    """
-                    INSERT INTO analytics_history (run_id, analysis, deductions)
-                    VALUES (%s, %s, %s)
-                """,
-                    (run_id, analysis_json, deductions_json),
-                )
-
-            conn.commit()
-            cursor.close()
-            conn.close()
+                # Inserir resultados em lote: um único statement preparado
+                # executado para todas as linhas, em vez de um round-trip
+                # por agent
+                if "agents" in results:
+                    rows = [
+                        (
+                            run_id,
+                            agent_data["id"],
+                            _json_dumps(agent_data.get("metrics", {})),
+                            _json_dumps(agent_data.get("category_scores", {})),
+                        )
+                        for agent_data in results["agents"]
+                    ]
+                    if rows:
+                        await conn.executemany(_SQL_INSERT_RESULTS, rows)
+
+            return dict(row) if row else None
         except Exception as e:
             print(f"Erro ao completar benchmark: {e}")
             raise e
 
-    async def fail_benchmark(self, run_id: str, error: str):
+    async def fail_benchmark(self, run_id: str, error: str) -> Optional[Dict[str, Any]]:
         """Marca o benchmark como falho"""
+        self._finalized.add(run_id)
+        self._pending_progress.pop(run_id, None)
+        self._last_progress.pop(run_id, None)
         try:
-            conn = self._get_db_connection()
-            cursor = conn.cursor()
-
-            cursor.execute(
-                """
-                UPDATE benchmarks
-                SET status = %s, completed_at = %s
-                WHERE run_id = %s
-            """,
-                ("failed", datetime.now(), run_id),
-            )
-
-            conn.commit()
-            cursor.close()
-            conn.close()
+            pool = await self._get_async_pool()
+            async with self._flush_lock:
+                row = await pool.fetchrow(
+                    _SQL_FAIL_BENCHMARK,
+                    "failed",
+                    datetime.now(),
+                    run_id,
+                )
+            return dict(row) if row else None
         except Exception as e:
             print(f"Erro ao marcar benchmark como falho: {e}")
             raise e
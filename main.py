@@ -4,21 +4,34 @@
 Main application entry point for AI Benchmark Service
 """
 
+import time
+
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, Response
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from benchmark_service.api.routes import router as api_router
+from benchmark_service.agents.session import close_session
 
 app = FastAPI(
     title="AI Benchmark Service",
     description="Service for evaluating AI agents performance",
     version="1.2.0",
+    # orjson serializa as árvores de resultados em C, sem o walk por
+    # elemento do json.dumps padrão
+    default_response_class=ORJSONResponse,
 )
 
 # Include API routes
 app.include_router(api_router, prefix="/api")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Fecha a sessão HTTP compartilhada dos adapters"""
+    await close_session()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -31,10 +44,22 @@ async def readiness_check():
     return {"status": "ready"}
 
 
+# Cache do payload de /metrics: generate_latest itera todos os collectors
+# a cada scrape; com TTL de 1s, scrapes frequentes viram um lookup
+_METRICS_CACHE_TTL = 1.0
+_metrics_cache = {"t": 0.0, "payload": b""}
+
+
 @app.get("/metrics")
 async def metrics():
     """Prometheus metrics endpoint"""
-    return generate_latest()
+    now = time.monotonic()
+    if now - _metrics_cache["t"] > _METRICS_CACHE_TTL:
+        _metrics_cache["payload"] = generate_latest()
+        _metrics_cache["t"] = now
+    # Response com o media type do formato de exposição, em vez de deixar
+    # o FastAPI embrulhar os bytes em JSON
+    return Response(_metrics_cache["payload"], media_type=CONTENT_TYPE_LATEST)
 
 
 if __name__ == "__main__":
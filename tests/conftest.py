@@ -0,0 +1,205 @@
+"""
+Fixtures compartilhadas entre as suítes de teste
+"""
+
+import copy
+import sys
+import os
+
+import httpx
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+
+# Adicionar o diretório raiz ao path para importar o módulo principal
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from main import app
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _orjson_response_json():
+    """Decodifica response.json() com orjson em toda a sessão
+
+    Os corpos de resultado de benchmark são dicts grandes e numéricos;
+    orjson.loads é bem mais rápido que o json da stdlib nesse perfil.
+    O lado servidor já responde via ORJSONResponse no main.py.
+    """
+    original = httpx.Response.json
+    httpx.Response.json = lambda self, **kwargs: orjson.loads(self.content)
+    yield
+    httpx.Response.json = original
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient único por sessão de testes
+
+    O bloco with dispara os eventos de lifespan do app uma vez por
+    sessão, em vez de reconstruir cliente e router a cada teste.
+    """
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+async def ac():
+    """Cliente ASGI assíncrono
+
+    Chama o app diretamente no event loop do teste, sem o thread + portal
+    síncrono do TestClient, e permite sobrepor requisições independentes
+    com asyncio.gather.
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as async_client:
+        yield async_client
+
+
+# Modelos canônicos de agent usados pelos testes de API: os testes semeiam
+# a store com seed_result em vez de repetir literais de dezenas de linhas
+_AGENT_TEMPLATES = {
+    "gpt-4-turbo": {
+        "id": "gpt-4-turbo",
+        "metrics": {
+            "accuracy": 87.3,
+            "latency_avg": 4.2,
+            "tokens_avg": 1428,
+            "consistency": 4.7,
+        },
+        "category_scores": {"mathematics": 92.4, "logical_reasoning": 88.2},
+    },
+    "claude-3-opus": {
+        "id": "claude-3-opus",
+        "metrics": {
+            "accuracy": 82.1,
+            "latency_avg": 6.8,
+            "tokens_avg": 1380,
+            "consistency": 4.3,
+        },
+        "category_scores": {"mathematics": 85.6, "logical_reasoning": 84.0},
+    },
+    "local": {
+        "id": "local",
+        "metrics": {
+            "accuracy": 75.0,
+            "latency_avg": 2.1,
+            "tokens_avg": 850,
+            "consistency": 4.0,
+        },
+        "category_scores": {"mathematics": 80.0, "logical_reasoning": 70.0},
+    },
+}
+
+
+async def asgi_call(method, path, body=None):
+    """Despacha um request direto ao app via ASGI puro
+
+    Monta o scope na mão e captura as mensagens send, pulando o modelo
+    de request do httpx (canonicalização de headers, cookie jar,
+    remontagem de response). Para testes que só checam o status e uma
+    chave do corpo; devolve (status, bytes do corpo).
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "scheme": "http",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+
+    messages = []
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if body_sent:
+            return {"type": "http.disconnect"}
+        body_sent = True
+        return {"type": "http.request", "body": body or b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+
+    status = next(m["status"] for m in messages if m["type"] == "http.response.start")
+    content = b"".join(
+        m.get("body", b"") for m in messages if m["type"] == "http.response.body"
+    )
+    return status, content
+
+
+class URL:
+    """Templates de endpoint pré-compilados
+
+    Métodos str.format ligados: o template é parseado uma única vez no
+    import, em vez de um f-string novo a cada chamada de teste.
+    """
+
+    status = "/api/benchmark/{}".format
+    results = "/api/benchmark/results/{}".format
+    analysis = "/api/benchmark/results/{}/analysis".format
+    deductions = "/api/benchmark/results/{}/deductions".format
+    report = "/api/benchmark/results/{}/report".format
+
+
+@pytest.fixture(
+    params=[
+        {"agents": ["gpt-4-turbo"], "benchmark": "mmlu-reasoning-v1"},
+        {"agents": ["local"], "benchmark": "gsm8k-math-v2"},
+    ],
+    ids=["gpt", "local"],
+)
+def created_run(client, request):
+    """Cria um benchmark via API e devolve (run_id, payload)
+
+    Centraliza o boilerplate "POST /run e pegar o run_id" e roda cada
+    teste consumidor contra as duas variantes de payload.
+    """
+    response = client.post("/api/benchmark/run", json=request.param)
+    assert response.status_code == 200
+    return response.json()["run_id"], request.param
+
+
+@pytest.fixture(scope="session")
+def seed_result():
+    """Helper para montar o resultado canônico de um benchmark concluído
+
+    Os templates são copiados (deepcopy) em cada chamada: a store
+    pré-serializa resultados com orjson, que não aceita views imutáveis,
+    e cópias independentes evitam vazamento de estado entre testes.
+    """
+
+    def _seed(
+        run_id,
+        benchmark="mmlu-reasoning-v1",
+        agent_ids=("gpt-4-turbo", "claude-3-opus"),
+        **extra,
+    ):
+        result = {
+            "run_id": run_id,
+            "benchmark": benchmark,
+            "agents": [
+                copy.deepcopy(_AGENT_TEMPLATES[agent_id]) for agent_id in agent_ids
+            ],
+            "summary": {
+                "top_performer": agent_ids[0],
+                "critical_observations": [
+                    "Melhor desempenho em raciocínio matemático",
+                    "Consistência superior em múltiplas categorias",
+                ],
+            },
+        }
+        result.update(extra)
+        return result
+
+    return _seed
@@ -0,0 +1,50 @@
+"""
+Testes para o cache de respostas dos agents
+"""
+
+import pytest
+from benchmark_service.agents.cache import LLMCache
+
+
+def test_cache_key_deterministic():
+    """Testa que a chave do cache é determinística"""
+    key1 = LLMCache.make_key("gpt-4-turbo", "What is 2+2?", 0.7, 1024)
+    key2 = LLMCache.make_key("gpt-4-turbo", "What is 2+2?", 0.7, 1024)
+    key3 = LLMCache.make_key("gpt-4-turbo", "What is 3+3?", 0.7, 1024)
+
+    assert key1 == key2
+    assert key1 != key3
+
+
+def test_cache_get_set():
+    """Testa armazenamento e recuperação de respostas"""
+    cache = LLMCache()
+    key = LLMCache.make_key("local-model", "test prompt", 0.7, 1024)
+
+    assert cache.get(key) is None
+
+    response = {"response": "answer", "usage": {"total_tokens": 10}, "latency": 0.5}
+    cache.set(key, response)
+
+    assert cache.get(key) == response
+
+
+def test_cache_lru_eviction():
+    """Testa que entradas mais antigas são descartadas quando o cache enche"""
+    cache = LLMCache(maxsize=2)
+
+    cache.set("key-1", {"response": "1"})
+    cache.set("key-2", {"response": "2"})
+    cache.set("key-3", {"response": "3"})
+
+    assert cache.get("key-1") is None
+    assert cache.get("key-2") == {"response": "2"}
+    assert cache.get("key-3") == {"response": "3"}
+
+
+def test_cache_ttl_expiry():
+    """Testa que entradas expiradas não são retornadas"""
+    cache = LLMCache(ttl=0.0)
+    cache.set("key", {"response": "stale"})
+
+    assert cache.get("key") is None
@@ -3,45 +3,60 @@ Testes para o sistema de analytics
 """
 
 import pytest
+from collections import deque
 from benchmark_service.analytics.benchmark_analytics import BenchmarkAnalytics
 
+# Instância compartilhada: o analisador é stateless fora de
+# metrics_history, então os testes reusam o mesmo objeto e só limpam o
+# histórico entre eles
+_SHARED_ANALYTICS = BenchmarkAnalytics()
+
+# Par canônico de agents usado pela análise completa
+_TWO_AGENTS = (
+    {
+        "id": "agent-1",
+        "metrics": {
+            "accuracy": 85.5,
+            "latency_avg": 2.3,
+            "tokens_avg": 1200,
+            "consistency": 4.2,
+        },
+        "category_scores": {"mathematics": 88.0, "logical_reasoning": 83.0},
+    },
+    {
+        "id": "agent-2",
+        "metrics": {
+            "accuracy": 92.0,
+            "latency_avg": 1.8,
+            "tokens_avg": 1100,
+            "consistency": 4.7,
+        },
+        "category_scores": {"mathematics": 95.0, "logical_reasoning": 89.0},
+    },
+)
+
+
+@pytest.fixture
+def analytics():
+    """Entrega a instância compartilhada com o histórico zerado"""
+    _SHARED_ANALYTICS.metrics_history.clear()
+    return _SHARED_ANALYTICS
+
 
 def test_benchmark_analytics_initialization():
     """Testa a inicialização do sistema de analytics"""
     analytics = BenchmarkAnalytics()
     assert analytics is not None
-    assert isinstance(analytics.metrics_history, list)
+    assert isinstance(analytics.metrics_history, deque)
+    assert analytics.metrics_history.maxlen is not None
 
 
-def test_analyze_benchmark_results():
+def test_analyze_benchmark_results(analytics):
     """Testa análise de resultados de benchmark"""
-    analytics = BenchmarkAnalytics()
-
     # Dados de teste
     benchmark_results = {
         "benchmark": "test-benchmark",
-        "agents": [
-            {
-                "id": "agent-1",
-                "metrics": {
-                    "accuracy": 85.5,
-                    "latency_avg": 2.3,
-                    "tokens_avg": 1200,
-                    "consistency": 4.2,
-                },
-                "category_scores": {"mathematics": 88.0, "logical_reasoning": 83.0},
-            },
-            {
-                "id": "agent-2",
-                "metrics": {
-                    "accuracy": 92.0,
-                    "latency_avg": 1.8,
-                    "tokens_avg": 1100,
-                    "consistency": 4.7,
-                },
-                "category_scores": {"mathematics": 95.0, "logical_reasoning": 89.0},
-            },
-        ],
+        "agents": list(_TWO_AGENTS),
     }
 
     analysis = analytics.analyze_benchmark_results(benchmark_results)
@@ -56,10 +71,8 @@ def test_analyze_benchmark_results():
     assert "insights" in analysis
 
 
-def test_performance_metrics_analysis():
+def test_performance_metrics_analysis(analytics):
     """Testa análise de métricas de performance"""
-    analytics = BenchmarkAnalytics()
-
     agents = [
         {
             "id": "test-agent",
@@ -88,10 +101,8 @@ def test_performance_metrics_analysis():
     )  # 1.5s é Good, não Excellent
 
 
-def test_comparative_analysis():
+def test_comparative_analysis(analytics):
     """Testa análise comparativa entre agents"""
-    analytics = BenchmarkAnalytics()
-
     agents = [
         {
             "id": "agent-a",
@@ -124,10 +135,8 @@ def test_comparative_analysis():
     assert comparative_analysis["best_latency"] == "agent-b"
 
 
-def test_statistical_summary():
+def test_statistical_summary(analytics):
     """Testa geração de sumário estatístico"""
-    analytics = BenchmarkAnalytics()
-
     agents = [
         {"id": "agent-1", "metrics": {"accuracy": 80.0, "latency_avg": 2.0}},
         {"id": "agent-2", "metrics": {"accuracy": 90.0, "latency_avg": 1.0}},
@@ -146,10 +155,8 @@ def test_statistical_summary():
     assert accuracy_stats["median"] == 85.0
 
 
-def test_insights_generation():
+def test_insights_generation(analytics):
     """Testa geração de insights"""
-    analytics = BenchmarkAnalytics()
-
     agents = [
         {
             "id": "high-accuracy-agent",
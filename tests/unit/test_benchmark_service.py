@@ -2,18 +2,15 @@
 Testes para o serviço de benchmark
 """
 
+import orjson
 import pytest
 from unittest.mock import patch
-import sys
-import os
 
-# Add the project root to the path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from benchmark_service.analytics.benchmark_analytics import BenchmarkAnalytics
+from benchmark_service.analytics.data_deduction import DataDeductionEngine
+from benchmark_service.services.benchmark_service import BenchmarkService, _json_dumps
 
-from benchmark_service.services.benchmark_service import BenchmarkService
 
-
-@pytest.mark.asyncio
 async def test_start_benchmark():
     """Testa a criação de um novo benchmark"""
     service = BenchmarkService()
@@ -44,7 +41,6 @@ def test_get_run_status_not_found():
     assert status is None
 
 
-@pytest.mark.asyncio
 async def test_benchmark_lifecycle():
     """Testa o ciclo de vida completo de um benchmark"""
     service = BenchmarkService()
@@ -64,8 +60,9 @@ async def test_benchmark_lifecycle():
     assert status["status"] == "processing"
     assert status["started_at"] is not None
 
-    # Atualizar progresso
+    # Atualizar progresso (coalescido; forçar o flush para observar o valor)
     await service.update_progress(run_id, 0.5)
+    await service.flush_progress()
     status = service.get_run_status(run_id)
     assert status["progress"] == 0.5
 
@@ -76,3 +73,42 @@ async def test_benchmark_lifecycle():
     assert status["progress"] == 1.0
     assert status["completed_at"] is not None
     assert status["results_url"] == f"/api/benchmark/results/{run_id}"
+
+
+def test_real_analysis_serializes_through_complete_benchmark_boundary():
+    """Testa que a saída real do analytics passa pela serialização do banco
+
+    O analytics produz escalares NumPy e clusters com chave int; ambos
+    precisam atravessar o mesmo encoder usado por complete_benchmark.
+    """
+    agents = [
+        {
+            "id": f"agent-{i}",
+            "metrics": {
+                "accuracy": 70.0 + i * 5.5,
+                "latency_avg": 1.2 + i * 0.4,
+                "tokens_avg": 1000 + i * 80,
+                "consistency": 3.5 + i * 0.3,
+            },
+            "category_scores": {
+                "mathematics": 68.0 + i * 6.0,
+                "logical_reasoning": 72.0 + i * 4.5,
+            },
+        }
+        for i in range(5)
+    ]
+    benchmark_results = {"benchmark": "mmlu-reasoning-v1", "agents": agents}
+
+    analysis = BenchmarkAnalytics().analyze_benchmark_results(benchmark_results)
+    deductions = DataDeductionEngine().deduct_patterns(benchmark_results)
+
+    # Não deve levantar TypeError por tipos NumPy nem por chaves int
+    roundtripped_analysis = orjson.loads(_json_dumps(analysis))
+    roundtripped_deductions = orjson.loads(_json_dumps(deductions))
+
+    assert roundtripped_analysis["total_agents"] == len(agents)
+    clusters = roundtripped_deductions["performance_patterns"].get(
+        "performance_clusters", {}
+    )
+    # JSON só tem chave string: os rótulos de cluster chegam como "0", "1", ...
+    assert all(isinstance(label, str) for label in clusters)
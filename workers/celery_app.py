@@ -3,8 +3,26 @@ Configuração do Celery para workers
 """
 
 from celery import Celery
+from kombu.serialization import register
+import orjson
 import os
 
+
+def _orjson_dumps(obj) -> str:
+    return orjson.dumps(obj).decode()
+
+
+# Codec "orjson" sobre o mesmo content-type application/json: mensagens
+# JSON (de producers antigos, já que o padrão novo é msgpack) passam a
+# ser decodificadas pelo orjson sem mudança de formato no wire
+register(
+    "orjson",
+    _orjson_dumps,
+    orjson.loads,
+    content_type="application/json",
+    content_encoding="utf-8",
+)
+
 # Configuração do Celery
 celery_app = Celery(
     "benchmark",
@@ -13,11 +31,38 @@ celery_app = Celery(
     include=["workers.tasks"],
 )
 
-# Configurações
+# Configurações. msgpack é binário e bem mais rápido que o json da
+# stdlib para os payloads grandes de respostas de agents; json continua
+# aceito para rolling upgrade de workers antigos
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer="msgpack",
+    accept_content=["msgpack", "json"],
+    result_serializer="msgpack",
+    # zstd reduz 3-5x os payloads texto-pesados de resultados, e
+    # resultados expirados em 1h não acumulam RSS no Redis
+    task_compression="zstd",
+    result_compression="zstd",
+    result_expires=3600,
+    broker_transport_options={"visibility_timeout": 3600},
+    # Sem eventos de task nem estado STARTED: menos escritas no Redis
+    # por task quando ninguém consome esses sinais
+    task_track_started=False,
+    worker_send_task_events=False,
+    task_send_sent_event=False,
+    # Benchmarks são longos e heterogêneos: prefetch=1 impede um worker
+    # de acumular tasks que outros poderiam atender, acks_late devolve a
+    # task à fila se o worker morrer no meio, e reciclar o processo a
+    # cada 100 tasks limita a fragmentação de memória das alocações numpy
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_max_tasks_per_child=100,
+    # run_benchmark é I/O puro (HTTP aos agents) dentro de asyncio.run:
+    # threads escalam com conexões em vez de cores e convivem com o
+    # event loop por task, ao contrário de gevent (monkey-patch quebra
+    # aiohttp). Analytics CPU-bound deve rodar em outro worker prefork:
+    #   celery -A workers worker -Q benchmark_queue -P threads -c 64
+    worker_pool="threads",
     timezone="UTC",
     enable_utc=True,
     task_routes={
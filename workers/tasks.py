@@ -2,64 +2,104 @@
 Tarefas do Celery para execução de benchmarks
 """
 
-from celery import current_task
 from .celery_app import celery_app
 import asyncio
+from dataclasses import asdict, dataclass
 from typing import Dict, Any
 import time
 
+import orjson
+
+from benchmark_service.agents.session import close_session
+from benchmark_service.workers.benchmark_worker import BenchmarkWorker
+
+
+@dataclass(slots=True, frozen=True)
+class BenchmarkResult:
+    """Resultado de run_benchmark, com schema fixo
+
+    slots=True dispensa o __dict__ por instância quando milhares de
+    resultados ficam em buffer; convertido com asdict na fronteira do
+    result backend (msgpack espera dict).
+    """
+
+    task_id: str
+    status: str
+    config: Dict[str, Any]
+    metrics: Dict[str, Any]
+
 
 @celery_app.task(bind=True)
 def run_benchmark(self, config: Dict[str, Any]) -> Dict[str, Any]:
     """
     Executa um benchmark de forma assíncrona
+
+    O progresso é publicado por evento (uma questão concluída = um
+    update_state), sem loop de sleep segurando o slot do worker.
     """
-    try:
-        # Simula execução de benchmark
-        task_id = self.request.id
+    task_id = self.request.id
 
-        # Update progress
-        current_task.update_state(
+    # Producers antigos podem enviar o config como JSON cru
+    if isinstance(config, (bytes, str)):
+        config = orjson.loads(config)
+
+    self.update_state(
+        state="PROGRESS",
+        meta={"current": 0, "total": 100, "status": "Starting benchmark..."},
+    )
+
+    last_pct = 0
+
+    def progress_cb(pct: int, status: str) -> None:
+        # Publicar só em saltos de 25% (e no fim): cada update_state é
+        # uma escrita no result backend
+        nonlocal last_pct
+        if pct - last_pct < 25 and pct < 100:
+            return
+        last_pct = pct
+        self.update_state(
             state="PROGRESS",
-            meta={"current": 0, "total": 100, "status": "Starting benchmark..."},
+            meta={"current": pct, "total": 100, "status": status},
         )
 
-        # Simula processamento
-        for i in range(0, 101, 10):
-            time.sleep(0.5)  # Simula trabalho
-            current_task.update_state(
-                state="PROGRESS",
-                meta={
-                    "current": i,
-                    "total": 100,
-                    "status": f"Processing... {i}% complete",
-                },
+    async def _execute(benchmark_config: Dict[str, Any]) -> None:
+        worker = BenchmarkWorker()
+        try:
+            await worker.process_benchmark(
+                benchmark_config.get("run_id", task_id),
+                benchmark_config,
+                progress_cb=progress_cb,
             )
+        finally:
+            # O loop morre com o asyncio.run: fechar o pool asyncpg e a
+            # sessão aiohttp aqui, senão cada task vaza conexões abertas
+            await worker.benchmark_service.aclose()
+            await close_session()
+
+    started = time.perf_counter()
+    try:
+        asyncio.run(_execute(config))
 
-        # Resultado final
-        result = {
-            "task_id": task_id,
-            "status": "completed",
-            "config": config,
-            "metrics": {
-                "execution_time": 5.0,
-                "success_rate": 0.95,
-                "avg_response_time": 1.2,
-                "total_requests": 100,
-                "failed_requests": 5,
-            },
-        }
-
-        return result
+        return asdict(
+            BenchmarkResult(
+                task_id=task_id,
+                status="completed",
+                config=config,
+                metrics={"execution_time": time.perf_counter() - started},
+            )
+        )
 
     except Exception as e:
-        current_task.update_state(state="FAILURE", meta={"error": str(e)})
+        self.update_state(state="FAILURE", meta={"error": str(e)})
         raise
 
 
-@celery_app.task
-def health_check() -> Dict[str, str]:
+@celery_app.task(ignore_result=True, acks_late=False, name="workers.health")
+def health_check() -> None:
     """
     Health check para workers
+
+    ignore_result evita a escrita no result backend a cada probe — para
+    liveness, usar inspect().ping(). O retorno é descartado de propósito.
     """
-    return {"status": "healthy", "timestamp": time.time()}
+    return None